@@ -1,17 +1,26 @@
 from flask import Flask, request, jsonify
 from crew_system import CVProcessingCrew
+from models import split_skills, Job
+from grading import grade_submissions, submission_result, QuizStats
+from shared_store import SharedStore
+from utils import load_job_descriptions
 import tempfile
 import os
 
 app = Flask(__name__)
-crew = CVProcessingCrew()
+# Built at import time so that a preloading server (see wsgi.py) shares
+# them copy-on-write with every worker; mutable state goes to the store.
+store = SharedStore()
+crew = CVProcessingCrew(store=store)
+quiz_stats = QuizStats(store)
+job_index = [Job.from_dict(job) for job in load_job_descriptions()]
 
 
 def ensure_skills_is_array(job):
     skills = job.get("skills", [])
     if isinstance(skills, str):
         # Convert "Python, React, Node.js" → ["Python", "React", "Node.js"]
-        job["skills"] = [s.strip() for s in skills.split(",") if s.strip()]
+        job["skills"] = split_skills(skills)
     return job
 
 import os
@@ -33,7 +42,11 @@ def match_jobs():
     data = request.get_json()
     parsed_cv = data.get("parsed_cv")
     jobs = data.get("jobs")
-    jobs = [ensure_skills_is_array(job) for job in jobs if isinstance(job, dict)]
+    if jobs is None:
+        # No jobs sent: match against the built-in catalogue
+        jobs = job_index
+    else:
+        jobs = [ensure_skills_is_array(job) for job in jobs if isinstance(job, dict)]
 
     matches_result = crew.match_jobs(parsed_cv, jobs)
 
@@ -64,11 +77,11 @@ def generate_quiz():
     if result and "questions" in result:
         filtered = patch_and_filter_questions(result["questions"])
         result["questions"] = filtered
-        app.config["LAST_QUIZ"] = {
+        store.set("quiz", "LAST_QUIZ", {
             "candidate_name": candidate_name,
             "job": job,
             "questions": filtered
-        }
+        })
     return jsonify({
         "questions": filtered,
         "title": result.get("title", ""),
@@ -86,39 +99,46 @@ def submit_quiz():
     data = request.get_json()
     answers = data.get("answers")
     candidate_name = data.get("candidate_name", "Candidate")
+    if not isinstance(answers, (list, dict)):
+        return jsonify({"error": "Missing answers"}), 400
 
-    quiz_data = app.config.get("LAST_QUIZ")
+    quiz_data = store.get("quiz", "LAST_QUIZ")
     if not quiz_data:
         return jsonify({"error": "Quiz session expired or not started"}), 400
 
     questions_raw = quiz_data["questions"]
     job = quiz_data["job"]
 
-    score = 0
-    total = len(questions_raw)
-    correct_answers = 0
+    try:
+        graded = grade_submissions(questions_raw, [answers])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    quiz_stats.record(job_key(job), questions_raw, graded)
+    result = submission_result(graded)
 
-    for i, q in enumerate(questions_raw):
-        user_answer = answers[i] if i < len(answers) else None
-        correct = q.get("correct_answer")
-        if user_answer == correct:
-            correct_answers += 1
-
-    if total > 0:
-        score = correct_answers / total * 100
-
-    status = "PASS" if score >= 50 else "RETRY"
+    status = "PASS" if result["passed"] else "RETRY"
 
     return jsonify({
-        "score": score,
+        "score": result["score"],
         "status": status,
-        "correct_answers": correct_answers,
-        "total_questions": total,
-        "category_scores": {},
+        "correct_answers": result["correct_answers"],
+        "total_questions": result["total_questions"],
+        "category_scores": result["category_scores"],
+        "difficulty_scores": result["difficulty_scores"],
         "next_action": "retry" if status == "RETRY" else "apply"
     })
 
 
+@app.route("/quiz-stats", methods=["GET"])
+def get_quiz_stats():
+    job_id = request.args.get("job_id")
+    return jsonify(quiz_stats.summary(job_id))
+
+
+def job_key(job):
+    return str(job.get("job_id") or job.get("job_title") or "unknown")
+
+
 
 
 def patch_and_filter_questions(questions):
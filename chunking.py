@@ -0,0 +1,189 @@
+import re
+
+from models import normalize_skill, split_skills
+
+CHARS_PER_TOKEN = 4
+# Instructions and schema of chunk_prompt, in tokens
+PROMPT_OVERHEAD_TOKENS = 200
+# The single-pass parse_cv task: full schema template plus the CrewAI
+# role/goal/backstory and agent instructions wrapped around it
+SINGLE_PASS_OVERHEAD_TOKENS = 700
+# Extracted JSON (keys, quotes, descriptions copied over) is longer than the
+# text it comes from, and all of it has to fit in num_predict
+OUTPUT_TOKENS_PER_TEXT_TOKEN = 1.5
+MIN_CHUNK_CHARS = 500
+
+SECTION_HEADING = re.compile(
+    r"^\W*(profile|profil|summary|résumé|about me|objective|objectif|"
+    r"experiences?|expériences?|work experience|professional experience|expérience professionnelle|"
+    r"employment|internships?|stages?|education|formations?|academic background|parcours académique|"
+    r"skills|compétences|technical skills|compétences techniques|"
+    r"projects|projets|academic projects|projets académiques|"
+    r"certifications?|certificates|publications|research|recherche|teaching|enseignement|"
+    r"languages|langues|awards|honors|distinctions|activities|activités|interests|centres d'intérêt|"
+    r"references|références|volunteering|bénévolat)\W*$",
+    re.IGNORECASE,
+)
+
+
+def _text_tokens(llm_options, overhead_tokens):
+    """Tokens of CV text whose prompt fits in num_ctx and whose answer fits in num_predict"""
+    num_predict = llm_options.get("num_predict", 256)
+    context_room = llm_options.get("num_ctx", 2048) - num_predict - overhead_tokens
+    return min(context_room, int(num_predict / OUTPUT_TOKENS_PER_TEXT_TOKEN))
+
+
+def chunk_budget(llm_options):
+    """Characters of CV text that fit in one chunk_prompt next to the instructions and the answer"""
+    return max(MIN_CHUNK_CHARS, _text_tokens(llm_options, PROMPT_OVERHEAD_TOKENS) * CHARS_PER_TOKEN)
+
+
+def single_pass_budget(llm_options):
+    """Characters of CV text the single-pass parse_cv task can hold without truncation.
+
+    Zero with the default num_ctx of 1024: the single-pass path only runs
+    for models given a larger context.
+    """
+    return max(0, _text_tokens(llm_options, SINGLE_PASS_OVERHEAD_TOKENS) * CHARS_PER_TOKEN)
+
+
+def split_sections(text):
+    """Split CV text at section headings; the part before the first heading is kept first"""
+    sections, current = [], []
+    for line in text.splitlines():
+        if current and len(line.strip()) <= 40 and SECTION_HEADING.match(line.strip()):
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+    if current:
+        sections.append("\n".join(current).strip())
+    return [s for s in sections if s]
+
+
+def _split_long(section, max_chars):
+    """Break an oversized section on line boundaries (hard-wrapping very long lines)"""
+    lines = section.splitlines()
+    heading = lines[0] if len(lines[0]) < 40 else ""
+    pieces, current = [], ""
+    for line in lines:
+        for start in range(0, max(len(line), 1), max_chars):
+            segment = line[start:start + max_chars]
+            if current and len(current) + len(segment) + 1 > max_chars:
+                pieces.append(current)
+                # repeat the heading so the model knows which section it is reading
+                current = heading if heading and len(heading) + len(segment) + 1 <= max_chars else ""
+            current = f"{current}\n{segment}" if current else segment
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_cv_text(text, max_chars):
+    """Pack whole sections into chunks of at most ``max_chars`` characters"""
+    chunks, current = [], ""
+    for section in split_sections(text):
+        parts = [section] if len(section) <= max_chars else _split_long(section, max_chars)
+        for part in parts:
+            if current and len(current) + len(part) + 2 > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{part}" if current else part
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def chunk_prompt(chunk, index, total, language):
+    return (
+        f"Extract CV information from part {index} of {total} of a CV (language: {language}).\n"
+        "Return only JSON with those of these keys that appear in this part: "
+        'personal_info {name, email, phone, address, linkedin, github}, summary, '
+        'education [{degree, institution, year, gpa}], '
+        'experience [{title, company, duration, description, technologies []}], '
+        'skills {technical [], soft [], languages []}, certifications [], '
+        'projects [{name, description, technologies [], url}].\n\n'
+        f"CV part:\n{chunk}"
+    )
+
+
+def _key(*values):
+    return tuple(normalize_skill(v or "") for v in values)
+
+
+def _union(target, values):
+    seen = {normalize_skill(v) for v in target}
+    for value in values or []:
+        if isinstance(value, str) and value.strip() and normalize_skill(value) not in seen:
+            seen.add(normalize_skill(value))
+            target.append(value.strip())
+    return target
+
+
+def _merge_items(merged, items, key_fields, list_fields=()):
+    """Dedupe dict items on key_fields; duplicates keep the longest text and union their lists"""
+    index = {_key(*(m.get(f) for f in key_fields)): m for m in merged}
+    for item in items or []:
+        if not isinstance(item, dict):
+            continue
+        key = _key(*(item.get(f) for f in key_fields))
+        if not any(key):
+            continue
+        existing = index.get(key)
+        if existing is None:
+            existing = index[key] = {}
+            merged.append(existing)
+        for field, value in item.items():
+            if isinstance(value, str):
+                value = value.strip()
+            if field in list_fields:
+                # models often answer "technologies": "Python, Docker"
+                existing[field] = _union(existing.get(field, []), split_skills(value))
+            elif field not in existing or existing[field] in (None, ""):
+                existing[field] = value
+            elif isinstance(value, str) and isinstance(existing[field], str) and len(value) > len(existing[field]):
+                existing[field] = value
+    return merged
+
+
+def merge_partials(partials, language):
+    """Combine per-chunk parses into the parse_cv output schema, in chunk order"""
+    result = {
+        "personal_info": {k: "" for k in ("name", "email", "phone", "address", "linkedin", "github")},
+        "summary": "",
+        "education": [],
+        "experience": [],
+        "skills": {"technical": [], "soft": [], "languages": []},
+        "certifications": [],
+        "projects": [],
+        "detected_language": language,
+    }
+    for partial in partials:
+        info = partial.get("personal_info")
+        if isinstance(info, dict):
+            for field, value in info.items():
+                if value and not result["personal_info"].get(field):
+                    result["personal_info"][field] = value
+        if isinstance(partial.get("summary"), str) and not result["summary"]:
+            result["summary"] = partial["summary"]
+
+        _merge_items(result["education"], partial.get("education"), ("degree", "institution"))
+        _merge_items(result["experience"], partial.get("experience"), ("title", "company"),
+                     list_fields=("technologies",))
+        _merge_items(result["projects"], partial.get("projects"), ("name",),
+                     list_fields=("technologies",))
+
+        # lists of names may also come as "Python, SQL"
+        skills = partial.get("skills")
+        if isinstance(skills, dict):
+            for category in ("technical", "soft", "languages"):
+                _union(result["skills"][category], split_skills(skills.get(category)))
+        elif isinstance(skills, (list, str)):
+            _union(result["skills"]["technical"], split_skills(skills))
+
+        certifications = partial.get("certifications") or []
+        if isinstance(certifications, str):
+            certifications = split_skills(certifications)
+        _union(result["certifications"],
+               [c if isinstance(c, str) else c.get("name", "") for c in certifications
+                if isinstance(c, (str, dict))])
+    return result
@@ -0,0 +1 @@
+# Lets the tests in tests/ import the top-level modules of this project.
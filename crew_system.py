@@ -1,8 +1,13 @@
 from crewai import Agent, Task, Crew, Process
 from crewai_tools import FileReadTool
-from langchain_community.llms import Ollama
 import json
 from utils import extract_text_from_file, load_job_descriptions, detect_language
+from llm_router import LLMRouter
+from singleflight import SingleFlight, request_key, file_digest
+from models import ParsedCV, Job
+from matching import rank_jobs, explanation_key, explanation_prompt, ExplanationCache
+from chunking import chunk_budget, single_pass_budget, chunk_cv_text, chunk_prompt, merge_partials
+from concurrent.futures import ThreadPoolExecutor
 
 def _extract_json_payload(text: str):
     """Extract a valid JSON object/array from LLM output (handles ``` fences)."""
@@ -31,18 +36,20 @@ def _extract_json_payload(text: str):
     return None
 
 
+def _prompt_json(value):
+    """Compact JSON for prompts: indentation only costs context tokens"""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
 
 class CVProcessingCrew:
-    def __init__(self):
-        self.llm =  Ollama(
-            model="ollama/llama3.1:8b",                 # ✅ no "ollama/" prefix
-            base_url="http://localhost:11434",
-            num_ctx=1024,                        # keep small for 4GB VRAM
-            num_thread=4,                        # adjust to your CPU
-            num_gpu=1,                           # use your GTX 1650
-            num_predict=256,                     # shorter generations = lower mem                    # smaller batch = lower VRAM/RAM
-            temperature=0.2                    # (optional)
-            )
+    def __init__(self, router=None, store=None):
+        # Parsing can run on a smaller model than quizzes, see LLM_TASK_MODELS
+        self.router = router or LLMRouter.from_env()
+        self.llm = self.router.llm_for("default")
+        # Identical concurrent requests share one generation
+        self.flight = SingleFlight.from_env()
+        # Pass a SharedStore to share explanations between worker processes
+        self.explanations = ExplanationCache(store=store)
         self.setup_agents()
     
     def setup_agents(self):
@@ -55,19 +62,7 @@ class CVProcessingCrew:
             education, experience, skills, and certifications, then structure it into clean JSON format.''',
             verbose=True,
             allow_delegation=False,
-            llm=self.llm
-        )
-        
-        # Job Matching Agent
-        self.job_matcher = Agent(
-            role='Job Matching Expert',
-            goal='Match candidate profiles with suitable job opportunities based on skills and experience',
-            backstory='''You are a recruitment expert who specializes in matching candidates to jobs. 
-            You analyze CVs and job descriptions to find the best matches based on skills, experience, 
-            education, and requirements. You provide similarity scores and detailed explanations.''',
-            verbose=True,
-            allow_delegation=False,
-            llm=self.llm
+            llm=self.router.llm_for("parse")
         )
         
         # Quiz Generation Agent
@@ -79,15 +74,23 @@ class CVProcessingCrew:
             You create multiple choice, true/false with proper scoring.''',
             verbose=True,
             allow_delegation=False,
-            llm=self.llm
+            llm=self.router.llm_for("quiz")
         )
     
     def parse_cv(self, file_path):
         """Parse CV and return structured JSON"""
+        key = request_key("parse_cv", file_digest(file_path))
+        return self.flight.do(key, lambda: self._parse_cv(file_path))
+
+    def _parse_cv(self, file_path):
         
         # Extract text from file
         cv_text = extract_text_from_file(file_path)
         language = detect_language(cv_text)
+
+        # A CV longer than the context window would be silently truncated
+        if len(cv_text) > single_pass_budget(self.router.options_for("parse")):
+            return self._parse_cv_chunked(cv_text, language)
         
         task = Task(
             description=f'''
@@ -167,82 +170,99 @@ class CVProcessingCrew:
 
         # Fallback if JSON parsing still fails
         return {"error": "Failed to parse CV", "raw_output": str(result)}
-    
-    def match_jobs(self, parsed_cv, job_descriptions):
-        """Match parsed CV with jobs from input, not from utils.py"""
-        import json
-        from crewai import Task, Crew, Process
 
-        task = Task(
-            description=f'''
-            Match the following candidate profile with available job positions:
-
-            Candidate Profile:
-            {json.dumps(parsed_cv, indent=2)}
+    def _parse_cv_chunked(self, cv_text, language):
+        """Map-reduce parse: extract section-aligned chunks concurrently, then merge them"""
+        chunks = chunk_cv_text(cv_text, chunk_budget(self.router.options_for("parse")))
+        prompts = [chunk_prompt(chunk, i + 1, len(chunks), language) for i, chunk in enumerate(chunks)]
 
-            Available Jobs:
-            {json.dumps(job_descriptions, indent=2)}
+        # The router caps how many of these run at once per endpoint; the rest
+        # wait for a slot (without a time limit unless LLM_QUEUE_TIMEOUT is set)
+        with ThreadPoolExecutor(max_workers=max(1, len(prompts))) as pool:
+            outputs = list(pool.map(self._extract_chunk, prompts))
 
-            Analyze the candidate's skills, experience, and education against each job's requirements.
-            Calculate similarity scores (0-100) based on:
-            - Technical skills match
-            - Experience relevance
-            - Education requirements
-            - Soft skills alignment
+        partials = [parsed for _, parsed in outputs if parsed is not None]
+        if not partials:
+            return {"error": "Failed to parse CV", "raw_output": "\n".join(raw for raw, _ in outputs)}
 
-            Return the top 3 matches in JSON format:
-            {{
-                "matches": [
-                    {{
-                        "job_id": "",
-                        "job_title": "",
-                        "company": "",
-                        "job_type": "",
-                        "description": "",
-                        "requirements": "",
-                        "similarity_score": 0.0,
-                        "matching_skills": [],
-                        "missing_skills": [],
-                        "match_explanation": ""
-                    }}
-                ]
-            }}
+        result = merge_partials(partials, language)
+        # Don't let a failed chunk silently drop a section of the CV
+        failed = [i + 1 for i, (_, parsed) in enumerate(outputs) if parsed is None]
+        if failed:
+            result["incomplete_chunks"] = failed
+            result["warnings"] = [f"Could not extract part {i} of {len(chunks)} of the CV" for i in failed]
+        return result
 
-            Return only valid JSON without any additional text.
-            ''',
-            agent=self.job_matcher,
-            expected_output="JSON with top 3 job matches and similarity scores"
-        )
-
-        crew = Crew(
-            agents=[self.job_matcher],
-            tasks=[task],
-            verbose=True,
-            process=Process.sequential
-        )
-
-        result = crew.kickoff()
+    def _extract_chunk(self, prompt):
+        try:
+            result = str(self.router.invoke("parse", prompt))
+        except Exception as e:
+            return str(e), None
         payload = _extract_json_payload(result)
         if payload:
             try:
-                return json.loads(payload)
+                parsed = json.loads(payload)
+                if isinstance(parsed, dict):
+                    return result, parsed
             except json.JSONDecodeError:
                 pass
+        return result, None
+    
+    def match_jobs(self, parsed_cv, job_descriptions):
+        """Match parsed CV with jobs from input, not from utils.py"""
+        key = request_key("match_jobs", parsed_cv, job_descriptions)
+        return self.flight.do(key, lambda: self._match_jobs(parsed_cv, job_descriptions))
+
+    def _match_jobs(self, parsed_cv, job_descriptions):
+        # Stage 1: scores and skill lists come from set operations on the records
+        cv = ParsedCV.from_dict(parsed_cv)
+        jobs = [job if isinstance(job, Job) else Job.from_dict(job)
+                for job in job_descriptions if isinstance(job, (Job, dict))]
+        matches = rank_jobs(cv, jobs)
 
-        return {"matches": [], "error": "Failed to match jobs", "raw_output": str(result)}
+        # Stage 2: only the final top matches get an LLM-written explanation
+        with ThreadPoolExecutor(max_workers=max(1, len(matches))) as pool:
+            explanations = list(pool.map(self._explain_match, matches))
+        for match, explanation in zip(matches, explanations):
+            match["match_explanation"] = explanation
+
+        return {"matches": matches}
+
+    def _explain_match(self, match):
+        """Short explanation for one match, shared by candidates with the same relevant skills"""
+        key = explanation_key(match)
+        explanation = self.explanations.get(key)
+        if explanation is not None:
+            return explanation
+
+        # A plain completion: the agent loop would add far more tokens than the answer
+        try:
+            explanation = str(self.router.invoke("match", explanation_prompt(match))).strip()
+        except Exception:
+            explanation = ""
+        if not explanation:
+            required = len(match["matching_skills"]) + len(match["missing_skills"])
+            return f"Matches {len(match['matching_skills'])} of {required} required skills."
+
+        self.explanations.set(key, explanation)
+        return explanation
     
     def generate_quiz(self, parsed_cv, selected_job):
         """Generate quiz based on job requirements and candidate profile"""
+        key = request_key("generate_quiz", parsed_cv, selected_job)
+        return self.flight.do(key, lambda: self._generate_quiz(parsed_cv, selected_job))
+
+    def _generate_quiz(self, parsed_cv, selected_job):
 
         task = Task(
             description=f'''
             Create a technical and behavioral quiz for the following job and candidate:
             
             Candidate Profile:
-            {json.dumps(parsed_cv, indent=2)}
+            {_prompt_json(parsed_cv)}
             
             Selected Job:
-            {json.dumps(selected_job, indent=2)}
+            {_prompt_json(selected_job)}
             
             Generate 8-10 questions that test:
             - Technical skills required for the job
@@ -0,0 +1,247 @@
+import threading
+
+import numpy as np
+
+UNANSWERED = -1
+PASS_MARK = 50
+ABCD = ["A", "B", "C", "D"]
+
+
+def normalize_answer(answer, question):
+    """Map an answer (option text, index, letter or bool) to an option index.
+
+    Option text wins over the index/letter readings, so options like "1"
+    or "C" are graded as the text the candidate picked.
+    """
+    options = question.get("options", [])
+    if isinstance(answer, bool):
+        return 0 if answer else 1
+    if isinstance(answer, (int, np.integer)):
+        return int(answer) if 0 <= answer < len(options) else UNANSWERED
+    if isinstance(answer, str):
+        a = answer.strip()
+        for idx, opt in enumerate(options):
+            if a.lower() == str(opt).strip().lower():
+                return idx
+        if a.isdigit() and int(a) < len(options):
+            return int(a)
+        if a.upper() in ABCD[:len(options)] and len(a) == 1:
+            return ABCD.index(a.upper())
+    return UNANSWERED
+
+
+def answer_key(questions):
+    """Correct option index per question (-1 if the quiz has no usable key)"""
+    return np.array(
+        [normalize_answer(q.get("correct_answer"), q) for q in questions],
+        dtype=np.int16,
+    ).reshape(len(questions))
+
+
+def answer_matrix(submissions, questions):
+    """Stack submissions into an (n_submissions, n_questions) index matrix.
+
+    A submission is a list aligned with ``questions`` or a dict keyed by
+    question position; missing answers become UNANSWERED. Raises
+    ValueError for dict keys that are not positions.
+    """
+    matrix = np.full((len(submissions), len(questions)), UNANSWERED, dtype=np.int16)
+    for row, answers in enumerate(submissions):
+        if isinstance(answers, dict):
+            try:
+                items = [(int(k), v) for k, v in answers.items()]
+            except (TypeError, ValueError):
+                raise ValueError("answers must be keyed by question position") from None
+        else:
+            items = enumerate(answers or [])
+        for col, answer in items:
+            if 0 <= col < len(questions):
+                matrix[row, col] = normalize_answer(answer, questions[col])
+    return matrix
+
+
+def _group_scores(correct, labels):
+    """Percentage score per label, one array of length n_submissions per label"""
+    scores = {}
+    for label in np.unique(labels):
+        mask = labels == label
+        scores[str(label)] = correct[:, mask].sum(axis=1) * 100.0 / mask.sum()
+    return scores
+
+
+def grade_submissions(questions, submissions, pass_mark=PASS_MARK):
+    """Grade many submissions of the same quiz at once"""
+    key = answer_key(questions)
+    answers = answer_matrix(submissions, questions)
+    correct = (answers == key) & (key != UNANSWERED)
+
+    total = len(questions)
+    correct_answers = correct.sum(axis=1)
+    scores = correct_answers * 100.0 / total if total else np.zeros(len(submissions))
+
+    # LLM output may have null or non-string labels, which np.unique cannot sort
+    categories = np.array([str(q.get("category") or "general") for q in questions], dtype=object)
+    difficulties = np.array([str(q.get("difficulty") or "medium") for q in questions], dtype=object)
+
+    return {
+        "total_questions": total,
+        "correct": correct,
+        "correct_answers": correct_answers,
+        "scores": scores,
+        "passed": scores >= pass_mark,
+        "category_scores": _group_scores(correct, categories) if total else {},
+        "difficulty_scores": _group_scores(correct, difficulties) if total else {},
+    }
+
+
+def submission_result(graded, index=0):
+    """One row of grade_submissions output as plain Python values, ready for jsonify"""
+    return {
+        "score": float(graded["scores"][index]),
+        "passed": bool(graded["passed"][index]),
+        "correct_answers": int(graded["correct_answers"][index]),
+        "total_questions": graded["total_questions"],
+        "correct": graded["correct"][index].tolist(),
+        "category_scores": {k: round(float(v[index]), 2) for k, v in graded["category_scores"].items()},
+        "difficulty_scores": {k: round(float(v[index]), 2) for k, v in graded["difficulty_scores"].items()},
+    }
+
+
+def grade_submission(questions, answers, pass_mark=PASS_MARK):
+    """Grade a single submission"""
+    return submission_result(grade_submissions(questions, [answers], pass_mark=pass_mark))
+
+
+class _JobStats:
+    """Running sums for one job, enough to derive item statistics without rescans"""
+
+    def __init__(self):
+        self.submissions = 0
+        self.passes = 0
+        self.score_sum = 0.0
+        self.items = {}         # question text -> column
+        self.questions = []
+        self.n = np.zeros(0)
+        self.n_correct = np.zeros(0)
+        self.sum_t = np.zeros(0)
+        self.sum_t2 = np.zeros(0)
+        self.sum_ct = np.zeros(0)
+
+    _ARRAYS = ("n", "n_correct", "sum_t", "sum_t2", "sum_ct")
+
+    def to_dict(self):
+        data = {"submissions": self.submissions, "passes": self.passes,
+                "score_sum": self.score_sum, "questions": self.questions}
+        data.update({name: getattr(self, name).tolist() for name in self._ARRAYS})
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        if not data:
+            return stats
+        stats.submissions = data["submissions"]
+        stats.passes = data["passes"]
+        stats.score_sum = data["score_sum"]
+        stats.questions = list(data["questions"])
+        stats.items = {str(q).strip().lower(): i for i, q in enumerate(stats.questions)}
+        for name in cls._ARRAYS:
+            setattr(stats, name, np.array(data[name], dtype=float))
+        return stats
+
+    def _columns(self, questions):
+        cols = []
+        for q in questions:
+            text = str(q.get("question", "")).strip().lower()
+            if text not in self.items:
+                self.items[text] = len(self.questions)
+                self.questions.append(q.get("question", ""))
+            cols.append(self.items[text])
+        grow = len(self.questions) - len(self.n)
+        if grow > 0:
+            for name in self._ARRAYS:
+                setattr(self, name, np.concatenate([getattr(self, name), np.zeros(grow)]))
+        return np.array(cols, dtype=np.intp)
+
+    def update(self, questions, correct, scores, passed):
+        if not len(questions):
+            return
+        cols = self._columns(questions)
+        t = scores[:, None]
+        n_sub = correct.shape[0]
+        self.submissions += n_sub
+        self.passes += int(passed.sum())
+        self.score_sum += float(scores.sum())
+        np.add.at(self.n, cols, n_sub)
+        np.add.at(self.n_correct, cols, correct.sum(axis=0))
+        np.add.at(self.sum_t, cols, np.full(len(cols), scores.sum()))
+        np.add.at(self.sum_t2, cols, np.full(len(cols), (scores ** 2).sum()))
+        np.add.at(self.sum_ct, cols, (correct * t).sum(axis=0))
+
+    def summary(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n = self.n
+            p = self.n_correct / n
+            mean_t = self.sum_t / n
+            var_t = self.sum_t2 / n - mean_t ** 2
+            cov = self.sum_ct / n - p * mean_t
+            # point-biserial correlation between the item and the quiz score
+            discrimination = cov / np.sqrt(p * (1 - p) * var_t)
+
+        items = []
+        for i, question in enumerate(self.questions):
+            d = discrimination[i]
+            items.append({
+                "question": question,
+                "responses": int(n[i]),
+                "difficulty": round(float(p[i]), 3),
+                "discrimination": round(float(d), 3) if np.isfinite(d) else None,
+            })
+        return {
+            "submissions": self.submissions,
+            "pass_rate": round(self.passes / self.submissions, 3) if self.submissions else 0.0,
+            "average_score": round(self.score_sum / self.submissions, 2) if self.submissions else 0.0,
+            "items": items,
+        }
+
+
+class QuizStats:
+    """Per-job quiz analytics, updated incrementally as submissions are graded.
+
+    With a SharedStore the running totals live in the store (as plain
+    JSON), so every worker process records into and reports from the same
+    numbers.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def record(self, job_id, questions, graded):
+        """Fold the output of grade_submissions into the job's running totals"""
+        def fold(stats):
+            stats = stats or _JobStats()
+            stats.update(questions, graded["correct"], graded["scores"], graded["passed"])
+            return stats
+
+        if self.store is not None:
+            self.store.update("quiz_stats", str(job_id),
+                              lambda data: fold(_JobStats.from_dict(data)).to_dict())
+            return
+        with self._lock:
+            self._jobs[str(job_id)] = fold(self._jobs.get(str(job_id)))
+
+    def summary(self, job_id=None):
+        if self.store is not None:
+            jobs = {jid: _JobStats.from_dict(data) for jid, data in self.store.items("quiz_stats")}
+            return self._summarize(jobs, job_id)
+        with self._lock:
+            return self._summarize(self._jobs, job_id)
+
+    @staticmethod
+    def _summarize(jobs, job_id):
+        if job_id is not None:
+            stats = jobs.get(str(job_id))
+            return {str(job_id): stats.summary()} if stats else {}
+        return {jid: stats.summary() for jid, stats in jobs.items()}
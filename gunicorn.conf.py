@@ -0,0 +1,23 @@
+import multiprocessing
+import os
+
+# Shared between workers: coalescing of identical requests, the store
+# holding caches, quiz state and quiz statistics (see shared_store.py), and
+# the LLM endpoints' concurrency slots, so caps hold across all workers.
+# Defaults to a private per-user directory, never a shared one like /tmp.
+_state_dir = os.environ.get("CVBOT_STATE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "cvbot")
+os.makedirs(_state_dir, mode=0o700, exist_ok=True)
+os.environ.setdefault("COALESCE_DIR", os.path.join(_state_dir, "singleflight"))
+os.environ.setdefault("SHARED_STORE_PATH", os.path.join(_state_dir, "store.db"))
+os.environ.setdefault("LLM_SLOT_DIR", os.path.join(_state_dir, "llm_slots"))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5001)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# Threads cover requests waiting on the LLM; processes cover CPU work
+# (PDF extraction, language detection, JSON) that the GIL would serialize.
+worker_class = "gthread"
+threads = int(os.environ.get("THREADS_PER_WORKER", 4))
+# Import the app (and run wsgi.preload) once in the master, then fork
+preload_app = True
+# LLM generations on CPU boxes can be slow
+timeout = int(os.environ.get("WORKER_TIMEOUT", 300))
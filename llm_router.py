@@ -0,0 +1,285 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.request
+from typing import Any, List, Optional
+
+import requests
+from langchain_community.llms import Ollama
+from langchain_core.language_models.llms import LLM
+
+DEFAULT_MODEL = "ollama/llama3.1:8b"
+DEFAULT_BASE_URL = "http://localhost:11434"
+
+DEFAULT_LLM_OPTIONS = {
+    "num_ctx": 1024,        # keep small for 4GB VRAM
+    "num_thread": 4,        # adjust to your CPU
+    "num_gpu": 1,           # use your GTX 1650
+    "num_predict": 256,     # shorter generations = lower mem
+    "temperature": 0.2,
+}
+
+# Per-task overrides of the options above. CV extraction answers with JSON
+# about as long as the text it reads, which 256 tokens cannot hold.
+DEFAULT_TASK_OPTIONS = {
+    "parse": {"num_predict": 512},
+}
+
+
+class LLMEndpoint:
+    """One Ollama server and how many generations it may run at once"""
+
+    def __init__(self, base_url, max_concurrency=1, models=None):
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max(1, int(max_concurrency))
+        # None means the endpoint serves every model
+        self.models = set(models) if models else None
+        self.outstanding = 0
+        self.healthy = True
+        self.checked_at = 0.0
+
+    def serves(self, model):
+        return self.models is None or model in self.models
+
+    def has_capacity(self):
+        return self.healthy and self.outstanding < self.max_concurrency
+
+    def __repr__(self):
+        return f"LLMEndpoint({self.base_url!r}, outstanding={self.outstanding}/{self.max_concurrency})"
+
+
+class LLMRouter:
+    """Spread generations over several Ollama endpoints.
+
+    Each call picks the healthy endpoint with the fewest outstanding requests
+    (relative to its concurrency cap) among those serving the task's model.
+    Endpoints that cannot be reached are marked down and probed again after
+    ``health_interval`` seconds. Any failed call falls back to the next
+    endpoint and finally to ``default_model``.
+
+    ``request_timeout`` bounds one HTTP generation; ``queue_timeout`` bounds
+    the wait for a free slot (None waits as long as an endpoint is healthy).
+
+    Concurrency caps are per process unless ``slot_dir`` is set: then every
+    slot is also a lock file in that directory, so all processes using the
+    directory (e.g. gunicorn workers) share each endpoint's cap.
+    """
+
+    # How often a request waiting for a slot held by another process looks again
+    SLOT_POLL_INTERVAL = 0.05
+
+    def __init__(self, endpoints, task_models=None, default_model=DEFAULT_MODEL,
+                 request_timeout=120, queue_timeout=None, health_interval=30, llm_options=None,
+                 task_options=None, slot_dir=None):
+        if not endpoints:
+            raise ValueError("LLMRouter needs at least one endpoint")
+        self.endpoints = list(endpoints)
+        self.task_models = dict(task_models or {})
+        self.default_model = default_model
+        self.request_timeout = request_timeout
+        self.queue_timeout = queue_timeout
+        self.health_interval = health_interval
+        self.llm_options = dict(DEFAULT_LLM_OPTIONS if llm_options is None else llm_options)
+        self.task_options = dict(DEFAULT_TASK_OPTIONS if task_options is None else task_options)
+        self.slot_dir = slot_dir
+        if slot_dir:
+            os.makedirs(slot_dir, mode=0o700, exist_ok=True)
+        self._cond = threading.Condition()
+        self._clients = {}
+
+    @classmethod
+    def from_env(cls):
+        """Build a router from LLM_ENDPOINTS / LLM_TASK_MODELS / LLM_TASK_OPTIONS /
+        LLM_*_TIMEOUT / LLM_SLOT_DIR.
+
+        LLM_ENDPOINTS is either a comma separated list of base URLs or a JSON
+        list of {"base_url", "max_concurrency", "models"} objects.
+        """
+        raw = os.environ.get("LLM_ENDPOINTS", "").strip()
+        endpoints = []
+        if raw.startswith("["):
+            for item in json.loads(raw):
+                endpoints.append(LLMEndpoint(
+                    item["base_url"],
+                    max_concurrency=item.get("max_concurrency", 1),
+                    models=item.get("models"),
+                ))
+        elif raw:
+            endpoints = [LLMEndpoint(url.strip()) for url in raw.split(",") if url.strip()]
+        else:
+            endpoints = [LLMEndpoint(DEFAULT_BASE_URL)]
+
+        task_models = json.loads(os.environ.get("LLM_TASK_MODELS", "{}"))
+        task_options = dict(DEFAULT_TASK_OPTIONS)
+        task_options.update(json.loads(os.environ.get("LLM_TASK_OPTIONS", "{}")))
+        return cls(
+            endpoints,
+            task_models=task_models,
+            task_options=task_options,
+            default_model=os.environ.get("LLM_DEFAULT_MODEL", DEFAULT_MODEL),
+            request_timeout=int(os.environ.get("LLM_REQUEST_TIMEOUT", 120)),
+            queue_timeout=int(os.environ["LLM_QUEUE_TIMEOUT"]) if os.environ.get("LLM_QUEUE_TIMEOUT") else None,
+            slot_dir=os.environ.get("LLM_SLOT_DIR") or None,
+        )
+
+    def model_for(self, task):
+        return self.task_models.get(task, self.default_model)
+
+    def options_for(self, task):
+        """Generation options for ``task``: llm_options with the task's overrides"""
+        return dict(self.llm_options, **self.task_options.get(task, {}))
+
+    def llm_for(self, task):
+        """LangChain LLM that routes every call for ``task`` through this router"""
+        return RoutedLLM(router=self, task=task)
+
+    def check_health(self, endpoint):
+        """Probe the endpoint's /api/tags and record the result"""
+        try:
+            with urllib.request.urlopen(f"{endpoint.base_url}/api/tags", timeout=2) as resp:
+                ok = resp.status == 200
+        except Exception:
+            ok = False
+        with self._cond:
+            endpoint.healthy = ok
+            endpoint.checked_at = time.monotonic()
+            self._cond.notify_all()
+        return ok
+
+    def check_all(self):
+        return {endpoint.base_url: self.check_health(endpoint) for endpoint in self.endpoints}
+
+    def _recheck_down_endpoints(self):
+        # Claim each due probe under the lock, so concurrent requests don't all
+        # probe the same down endpoint; the others go on with the healthy ones
+        now = time.monotonic()
+        with self._cond:
+            due = [e for e in self.endpoints
+                   if not e.healthy and now - e.checked_at >= self.health_interval]
+            for endpoint in due:
+                endpoint.checked_at = now
+        for endpoint in due:
+            self.check_health(endpoint)
+
+    def _acquire(self, model, tried):
+        """Reserve a slot on the least loaded endpoint, waiting for one to free up.
+
+        Returns (endpoint, slot file or None), or None when no healthy
+        untried endpoint serves the model. Raises TimeoutError when
+        ``queue_timeout`` passes without a free slot.
+        """
+        deadline = None if self.queue_timeout is None else time.monotonic() + self.queue_timeout
+        with self._cond:
+            while True:
+                candidates = [e for e in self.endpoints
+                              if e.serves(model) and e.healthy and e not in tried]
+                if not candidates:
+                    return None
+                free = sorted((e for e in candidates if e.has_capacity()),
+                              key=lambda e: e.outstanding / e.max_concurrency)
+                for endpoint in free:
+                    slot = self._claim_slot(endpoint)
+                    if slot is not False:
+                        endpoint.outstanding += 1
+                        return endpoint, slot
+                # Slots held by other processes free up without notifying us
+                timeout = self.SLOT_POLL_INTERVAL if free else None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No free LLM slot for model '{model}' within {self.queue_timeout}s")
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                self._cond.wait(timeout)
+
+    def _claim_slot(self, endpoint):
+        """Lock a free slot file of the endpoint; None without slot_dir, False if all are taken"""
+        if not self.slot_dir:
+            return None
+        import fcntl  # POSIX only, and only needed when sharing caps across processes
+
+        name = hashlib.sha1(endpoint.base_url.encode("utf-8")).hexdigest()[:16]
+        for i in range(endpoint.max_concurrency):
+            slot = open(os.path.join(self.slot_dir, f"{name}.{i}.slot"), "a")
+            try:
+                fcntl.flock(slot, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return slot
+            except BlockingIOError:
+                slot.close()
+        return False
+
+    def _release(self, endpoint, slot=None, failed=False):
+        if slot is not None:
+            slot.close()  # closing the file drops its lock
+        with self._cond:
+            endpoint.outstanding -= 1
+            if failed:
+                endpoint.healthy = False
+                endpoint.checked_at = time.monotonic()
+            self._cond.notify_all()
+
+    def _client(self, endpoint, model, task):
+        key = (endpoint.base_url, model, task)
+        client = self._clients.get(key)
+        if client is None:
+            client = Ollama(
+                model=model,
+                base_url=endpoint.base_url,
+                timeout=self.request_timeout,
+                **self.options_for(task)
+            )
+            self._clients[key] = client
+        return client
+
+    def invoke(self, task, prompt, stop=None):
+        """Run ``prompt`` for ``task`` on the best endpoint, falling back on failure"""
+        self._recheck_down_endpoints()
+
+        models = [self.model_for(task)]
+        if models[0] != self.default_model:
+            models.append(self.default_model)
+
+        last_error = None
+        for attempt in range(2):
+            for model in models:
+                tried = set()
+                while True:
+                    acquired = self._acquire(model, tried)
+                    if acquired is None:
+                        break
+                    endpoint, slot = acquired
+                    tried.add(endpoint)
+                    unreachable = False
+                    try:
+                        return self._client(endpoint, model, task).invoke(prompt, stop=stop)
+                    except Exception as e:
+                        # Slow generations and missing models say nothing about the
+                        # server's health; only take unreachable servers out of rotation
+                        unreachable = isinstance(e, requests.exceptions.ConnectionError)
+                        last_error = e
+                    finally:
+                        self._release(endpoint, slot, failed=unreachable)
+
+            if attempt or any(e.healthy for e in self.endpoints):
+                break
+            # Every endpoint is marked down: probe now rather than fail until the next recheck
+            if not any(self.check_all().values()):
+                break
+
+        raise RuntimeError(f"No LLM endpoint could serve task '{task}'") from last_error
+
+
+class RoutedLLM(LLM):
+    """LangChain LLM wrapper so CrewAI agents can use an LLMRouter"""
+
+    router: Any
+    task: str = "default"
+
+    @property
+    def _llm_type(self) -> str:
+        return "routed-ollama"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None,
+              run_manager: Any = None, **kwargs: Any) -> str:
+        return self.router.invoke(self.task, prompt, stop=stop)
@@ -0,0 +1,164 @@
+"""Throughput of the production server as the number of worker processes grows.
+
+Starts gunicorn (gunicorn.conf.py) with 1, 2, 4 ... workers up to the core
+count, drives /match-jobs against a catalogue of generated jobs from several
+client processes and prints requests per second for each worker count:
+
+    python loadtest.py --duration 20 --clients 16
+
+Each run warms up first so explanations are in the shared cache; with
+Ollama running this measures the CPU-bound part of the request path. Every
+timed request carries a unique candidate name, so none of them can be
+served by request coalescing (singleflight.py) instead of the matcher.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+SKILLS = ["Python", "SQL", "JavaScript", "React", "Node.js", "Docker", "Kubernetes",
+          "AWS", "Linux", "Git", "Pandas", "Scikit-learn", "Machine Learning", "Flutter",
+          "Dart", "Java", "Spring", "Bash", "CI/CD", "Statistics", "TypeScript", "Go"]
+
+
+def make_jobs(count, rng):
+    return [{
+        "job_id": str(i),
+        "job_title": f"Engineer {i}",
+        "company": f"Company {i % 37}",
+        "job_type": "PFE",
+        "description": "Generated job for load testing",
+        "requirements": ", ".join(rng.sample(SKILLS, rng.randint(3, 8))),
+    } for i in range(count)]
+
+
+def make_cvs(count, rng):
+    return [{
+        "personal_info": {"name": f"Candidate {i}"},
+        "skills": {"technical": rng.sample(SKILLS, rng.randint(2, 10)), "soft": [], "languages": []},
+        "experience": [],
+        "projects": [],
+    } for i in range(count)]
+
+
+def post(url, payload):
+    req = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=300) as resp:
+        resp.read()
+
+
+def unique_payload(payload, tag):
+    """Same skills (so cached explanations apply) but a distinct request"""
+    parsed_cv = dict(payload["parsed_cv"], personal_info={"name": f"Candidate {tag}"})
+    return dict(payload, parsed_cv=parsed_cv)
+
+
+def client(url, payloads, duration, seed, results):
+    rng = random.Random(seed)
+    latencies, errors = [], 0
+    deadline = time.monotonic() + duration
+    count = 0
+    while time.monotonic() < deadline:
+        count += 1
+        payload = unique_payload(rng.choice(payloads), f"{seed}-{count}")
+        start = time.monotonic()
+        try:
+            post(url, payload)
+        except Exception:
+            errors += 1
+            continue
+        latencies.append(time.monotonic() - start)
+    results.put((latencies, errors))
+
+
+def wait_until_up(url, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url, timeout=2).read()
+            return
+        except Exception:
+            time.sleep(0.5)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+
+def run(workers, args, payloads):
+    state_dir = tempfile.mkdtemp(prefix="cvbot-loadtest-")
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(args.port),
+               CVBOT_STATE_DIR=state_dir)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_until_up(f"{base}/quiz-stats")
+        for payload in payloads:
+            post(f"{base}/match-jobs", payload)
+
+        results = multiprocessing.Queue()
+        clients = [multiprocessing.Process(target=client,
+                                           args=(f"{base}/match-jobs", payloads, args.duration, i, results))
+                   for i in range(args.clients)]
+        for p in clients:
+            p.start()
+        latencies, errors = [], 0
+        for _ in clients:
+            client_latencies, client_errors = results.get()
+            latencies.extend(client_latencies)
+            errors += client_errors
+        for p in clients:
+            p.join()
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    latencies.sort()
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / args.duration,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=int, default=20, help="seconds per worker count")
+    parser.add_argument("--clients", type=int, default=2 * multiprocessing.cpu_count())
+    parser.add_argument("--jobs", type=int, default=500, help="jobs per /match-jobs request")
+    parser.add_argument("--cvs", type=int, default=32, help="distinct candidate profiles")
+    parser.add_argument("--port", type=int, default=5099)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    jobs = make_jobs(args.jobs, rng)
+    payloads = [{"parsed_cv": cv, "jobs": jobs} for cv in make_cvs(args.cvs, rng)]
+
+    counts, n = [], 1
+    while n < multiprocessing.cpu_count():
+        counts.append(n)
+        n *= 2
+    counts.append(multiprocessing.cpu_count())
+
+    print(f"{'workers':>8} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for workers in counts:
+        r = run(workers, args, payloads)
+        print(f"{r['workers']:>8} {r['requests']:>9} {r['errors']:>7} {r['rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import os
 from pathlib import Path
 from crew_system import CVProcessingCrew
 from utils import save_uploaded_file, load_job_descriptions
+from grading import grade_submission
 
 def main():
     st.set_page_config(
@@ -96,7 +97,10 @@ def handle_job_matching():
     if st.button("Find Job Matches", type="primary"):
         with st.spinner("Finding the best job matches for you..."):
             try:
-                result = st.session_state.crew.match_jobs(st.session_state.parsed_cv)
+                result = st.session_state.crew.match_jobs(
+                    st.session_state.parsed_cv,
+                    load_job_descriptions()
+                )
                 st.session_state.job_matches = result
                 st.success("✅ Job matches found!")
                 st.write("Debug: job_matches content")
@@ -185,16 +189,16 @@ def display_quiz():
         submitted = st.form_submit_button("Submit Quiz", type="primary")
         
         if submitted:
-            score = calculate_score(answers, questions)
-            st.success(f"🎉 Quiz completed! Your score: {score:.1f}%")
+            result = grade_submission(questions, answers)
+            st.success(f"🎉 Quiz completed! Your score: {result['score']:.1f}%")
             
             # Show correct answers
             st.subheader("📊 Quiz Results")
             for i, question in enumerate(questions):
                 user_answer = answers.get(i, '')
-                correct_answer = question.get('correct_answer', '')
+                correct_answer = display_correct_answer(question)
                 
-                is_correct = str(user_answer).lower().strip() == str(correct_answer).lower().strip()
+                is_correct = result["correct"][i]
                 
                 st.write(f"**Question {i+1}:** {question.get('question', '')}")
                 st.write(f"Your answer: {user_answer}")
@@ -207,21 +211,12 @@ def display_quiz():
                 
                 st.divider()
 
-def calculate_score(answers, questions):
-    if not questions:
-        return 0
-    
-    correct = 0
-    total = len(questions)
-    
-    for i, question in enumerate(questions):
-        user_answer = str(answers.get(i, '')).lower().strip()
-        correct_answer = str(question.get('correct_answer', '')).lower().strip()
-        
-        if user_answer == correct_answer:
-            correct += 1
-    
-    return (correct / total) * 100 if total > 0 else 0
+def display_correct_answer(question):
+    correct_answer = question.get('correct_answer', '')
+    options = question.get('options', [])
+    if isinstance(correct_answer, int) and 0 <= correct_answer < len(options):
+        return options[correct_answer]
+    return correct_answer
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
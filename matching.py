@@ -0,0 +1,119 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from models import SKILLS, normalize_skill
+
+TOP_K = 3
+
+
+def score_job(cv, job):
+    """Deterministic skill match between a ParsedCV and a Job record.
+
+    The score is the share of the job's skills the candidate has (0-100),
+    nudged by Jaccard overlap so that tighter profiles rank first on ties.
+    """
+    job_skills = job.all_skills()
+    if not job_skills:
+        return 0.0, [], []
+
+    matching, missing = [], []
+    for name in job_skills:
+        (matching if SKILLS.intern(name) in cv.skill_ids else missing).append(name)
+
+    coverage = len(matching) / len(job_skills)
+    union = len(cv.skill_ids | job.skill_ids)
+    jaccard = len(cv.skill_ids & job.skill_ids) / union if union else 0.0
+    score = round(100 * (0.9 * coverage + 0.1 * jaccard), 1)
+    return score, matching, missing
+
+
+def rank_jobs(cv, jobs, top_k=TOP_K):
+    """Top ``top_k`` matches in the /match-jobs shape, without explanations"""
+    scored = []
+    for position, job in enumerate(jobs):
+        score, matching, missing = score_job(cv, job)
+        scored.append((-score, position, job, matching, missing))
+    scored.sort(key=lambda item: (item[0], item[1]))
+
+    matches = []
+    for neg_score, _, job, matching, missing in scored[:top_k]:
+        match = job.to_dict()
+        match.update({
+            "similarity_score": -neg_score,
+            "matching_skills": matching,
+            "missing_skills": missing,
+            "match_explanation": "",
+        })
+        matches.append(match)
+    return matches
+
+
+def explanation_key(match):
+    """Cache key for a match explanation: a hash of everything explanation_prompt uses.
+
+    Job ids are not part of it, since clients reuse and edit them; two
+    matches share an explanation only when their prompts say the same thing.
+    """
+    parts = [
+        str(match.get("job_title") or "").strip(),
+        str(match.get("company") or "").strip(),
+        ",".join(sorted({normalize_skill(s) for s in match.get("matching_skills", [])})),
+        ",".join(sorted({normalize_skill(s) for s in match.get("missing_skills", [])})),
+    ]
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def explanation_prompt(match):
+    job = match.get("job_title") or "this position"
+    if match.get("company"):
+        job += f" at {match['company']}"
+    return (
+        f"Job: {job}.\n"
+        f"Candidate has: {', '.join(match['matching_skills']) or 'none of the listed skills'}.\n"
+        f"Candidate lacks: {', '.join(match['missing_skills']) or 'nothing'}.\n"
+        "In at most two sentences, explain to the candidate how well they fit this job. "
+        "Return only the explanation."
+    )
+
+
+class ExplanationCache:
+    """Small thread-safe LRU of match explanations.
+
+    With a SharedStore, misses fall through to the store and new entries are
+    written to it, so an explanation generated by one worker serves them all.
+    Store entries expire after ``ttl`` seconds and are capped at
+    ``store_maxsize``.
+    """
+
+    def __init__(self, maxsize=4096, store=None, ttl=7 * 24 * 3600, store_maxsize=100000):
+        self.maxsize = maxsize
+        self.store = store
+        self.ttl = ttl
+        self.store_maxsize = store_maxsize
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                return value
+        if self.store is not None:
+            value = self.store.get("explanations", key)
+            if value is not None:
+                self._remember(key, value)
+        return value
+
+    def set(self, key, value):
+        self._remember(key, value)
+        if self.store is not None:
+            self.store.set("explanations", key, value, ttl=self.ttl, max_items=self.store_maxsize)
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
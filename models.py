@@ -0,0 +1,296 @@
+import sys
+import threading
+from dataclasses import dataclass, field, fields
+
+try:
+    import msgpack
+except ImportError:  # optional, only needed for binary caches / indexes
+    msgpack = None
+
+
+def normalize_skill(name):
+    """Canonical form used to compare skills: lowercase, single spaces"""
+    return " ".join(str(name).strip().lower().split())
+
+
+def split_skills(value):
+    """Skills may come as "Python, React" or ["Python", "React"]; always return a list"""
+    if isinstance(value, str):
+        return [s.strip() for s in value.split(",") if s.strip()]
+    if isinstance(value, (list, tuple)):
+        return [str(s).strip() for s in value if str(s).strip()]
+    return []
+
+
+class SkillRegistry:
+    """Interns normalized skill names to small integer ids shared by all records.
+
+    The table holds at most ``max_size`` names, so request data cannot grow
+    it without bound in a long-running worker. Once it is full, new names
+    are their own id (the normalized string): they still compare correctly,
+    they just aren't interned.
+    """
+
+    def __init__(self, max_size=50000):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._names = []
+
+    def intern(self, name):
+        key = normalize_skill(name)
+        skill_id = self._ids.get(key)
+        if skill_id is None:
+            with self._lock:
+                skill_id = self._ids.get(key)
+                if skill_id is None:
+                    if len(self._names) >= self.max_size:
+                        return key
+                    skill_id = len(self._names)
+                    self._names.append(sys.intern(key))
+                    self._ids[key] = skill_id
+        return skill_id
+
+    def ids(self, names):
+        return frozenset(self.intern(n) for n in names if normalize_skill(n))
+
+    def name(self, skill_id):
+        return skill_id if isinstance(skill_id, str) else self._names[skill_id]
+
+    def __len__(self):
+        return len(self._names)
+
+
+SKILLS = SkillRegistry()
+
+
+def _strings(values):
+    return tuple(sys.intern(s) for s in split_skills(values))
+
+
+def _skill_field(split=False):
+    # split=True also accepts a comma separated string, as models often return
+    return field(default=None, metadata={"skills": True, "split": split})
+
+
+def _records_field(cls_name):
+    return field(default=None, metadata={"records": cls_name})
+
+
+class _Record:
+    """Shared JSON conversion for the records below.
+
+    Typed fields are None when the key was absent from the source dict, and
+    keys that are unknown or not in the expected shape are kept verbatim in
+    ``extra``, so ``from_dict(d).to_dict() == d`` for the JSON we produce.
+    The exception is skill fields given as a comma separated string: they
+    come back as a list.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data or {})
+        kwargs = {}
+        for f in fields(cls):
+            if not f.init or f.name == "extra" or f.name not in data:
+                continue
+            value = data[f.name]
+            converted = _from_json(f, value)
+            if converted is not _INVALID:
+                kwargs[f.name] = converted
+                del data[f.name]
+        return cls(extra=data, **kwargs)
+
+    def to_dict(self):
+        out = {}
+        for f in fields(self):
+            if not f.init or f.name == "extra":
+                continue
+            value = getattr(self, f.name)
+            if value is None:
+                continue
+            if f.metadata.get("records"):
+                value = [v.to_dict() for v in value]
+            elif isinstance(value, tuple):
+                value = list(value)
+            elif isinstance(value, dict):
+                value = dict(value)
+            out[f.name] = value
+        out.update(self.extra)
+        return out
+
+
+_INVALID = object()
+
+
+def _from_json(f, value):
+    if f.metadata.get("skills"):
+        accepted = (list, str) if f.metadata["split"] else list
+        return _strings(value) if isinstance(value, accepted) else _INVALID
+    record_cls = f.metadata.get("records")
+    if record_cls:
+        cls = RECORD_TYPES[record_cls]
+        if not isinstance(value, list) or not all(isinstance(v, dict) for v in value):
+            return _INVALID
+        return tuple(cls.from_dict(v) for v in value)
+    if f.type in ("dict", dict):
+        return value if isinstance(value, dict) else _INVALID
+    if f.type in ("tuple", tuple):
+        return tuple(value) if isinstance(value, list) else _INVALID
+    if f.type in ("str", str):
+        if not isinstance(value, str):
+            return _INVALID
+        # short values (names, companies, job types) repeat a lot across records
+        return sys.intern(value) if len(value) < 64 else value
+    return value
+
+
+@dataclass(slots=True)
+class Education(_Record):
+    degree: str = None
+    institution: str = None
+    year: str = None
+    gpa: str = None
+    extra: dict = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Experience(_Record):
+    title: str = None
+    company: str = None
+    duration: str = None
+    description: str = None
+    technologies: tuple = _skill_field(split=True)
+    extra: dict = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Project(_Record):
+    name: str = None
+    description: str = None
+    technologies: tuple = _skill_field(split=True)
+    url: str = None
+    extra: dict = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class ParsedCV(_Record):
+    personal_info: dict = None
+    summary: str = None
+    education: tuple = _records_field("Education")
+    experience: tuple = _records_field("Experience")
+    skills: dict = None
+    certifications: tuple = None
+    projects: tuple = _records_field("Project")
+    detected_language: str = None
+    extra: dict = field(default_factory=dict)
+    skill_ids: frozenset = field(default=frozenset(), init=False, compare=False)
+
+    def __post_init__(self):
+        self.skill_ids = SKILLS.ids(self.all_skills())
+
+    def all_skills(self):
+        """Technical skills plus technologies listed under experience and projects"""
+        names = []
+        if isinstance(self.skills, dict):
+            names.extend(split_skills(self.skills.get("technical")))
+        for item in (self.experience or ()) + (self.projects or ()):
+            names.extend(item.technologies or ())
+        return names
+
+
+@dataclass(slots=True)
+class Job(_Record):
+    job_id: str = None
+    job_title: str = None
+    company: str = None
+    job_type: str = None
+    description: str = None
+    requirements: str = None
+    skills: tuple = _skill_field(split=True)
+    extra: dict = field(default_factory=dict)
+    skill_ids: frozenset = field(default=frozenset(), init=False, compare=False)
+
+    def __post_init__(self):
+        self.skill_ids = SKILLS.ids(self.all_skills())
+
+    def all_skills(self):
+        """Explicit skills if given, otherwise the comma separated requirements"""
+        if self.skills:
+            return list(self.skills)
+        return split_skills(self.requirements or "")
+
+
+@dataclass(slots=True)
+class Question(_Record):
+    id: int = None
+    question: str = None
+    type: str = None
+    options: tuple = None
+    correct_answer: object = None
+    explanation: str = None
+    difficulty: str = None
+    category: str = None
+    extra: dict = field(default_factory=dict)
+
+
+RECORD_TYPES = {cls.__name__: cls for cls in
+                (Education, Experience, Project, ParsedCV, Job, Question)}
+
+
+# Binary form: each record is [type name, field values...] in declaration
+# order, with skill lists replaced by indexes into a per-blob skill table.
+
+def _pack(record, table, index):
+    values = [type(record).__name__]
+    for f in fields(record):
+        if not f.init:
+            continue
+        value = getattr(record, f.name)
+        if value is not None and f.metadata.get("skills"):
+            encoded = []
+            for name in value:
+                if name not in index:
+                    index[name] = len(table)
+                    table.append(name)
+                encoded.append(index[name])
+            value = encoded
+        elif value is not None and f.metadata.get("records"):
+            value = [_pack(v, table, index) for v in value]
+        values.append(value)
+    return values
+
+
+def _unpack(values, table):
+    cls = RECORD_TYPES[values[0]]
+    kwargs = {}
+    for f, value in zip((f for f in fields(cls) if f.init), values[1:]):
+        if value is not None:
+            if f.metadata.get("skills"):
+                value = tuple(table[i] for i in value)
+            elif f.metadata.get("records"):
+                value = tuple(_unpack(v, table) for v in value)
+            elif isinstance(value, list):
+                value = tuple(value)
+        kwargs[f.name] = value
+    return cls(**kwargs)
+
+
+def dumps(records):
+    """Serialize records to compact msgpack bytes (for caches and on-disk indexes)"""
+    if msgpack is None:
+        raise RuntimeError("msgpack is required for binary serialization: pip install msgpack")
+    table, index = [], {}
+    packed = [_pack(r, table, index) for r in records]
+    return msgpack.packb([1, table, packed], use_bin_type=True)
+
+
+def loads(data):
+    if msgpack is None:
+        raise RuntimeError("msgpack is required for binary serialization: pip install msgpack")
+    version, table, packed = msgpack.unpackb(data, raw=False, strict_map_key=False)
+    if version != 1:
+        raise ValueError(f"Unsupported record format version: {version}")
+    return [_unpack(values, table) for values in packed]
@@ -0,0 +1,105 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def default_state_dir():
+    """Private per-user directory for state shared by worker processes"""
+    path = os.environ.get("CVBOT_STATE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "cvbot")
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+
+def default_store_path():
+    return os.environ.get("SHARED_STORE_PATH") or os.path.join(default_state_dir(), "store.db")
+
+
+class SharedStore:
+    """Key/value store in a local SQLite file, shared by every worker process.
+
+    Values are stored as JSON. Connections are per thread and reopened after
+    a fork, so a store created before workers are forked stays usable in
+    each of them. ``update`` runs read-modify-write under a write lock.
+    """
+
+    # How often (in set() calls per process) namespaces with max_items are pruned
+    PRUNE_EVERY = 256
+
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        self._local = threading.local()
+        self._sets = 0
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries (namespace TEXT, key TEXT, value TEXT, "
+                "expires_at REAL, updated_at REAL, PRIMARY KEY (namespace, key))"
+            )
+
+    def _connect(self):
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            local.db.execute("PRAGMA synchronous=NORMAL")
+            local.pid = os.getpid()
+        return local.db
+
+    def get(self, namespace, key, default=None):
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM entries WHERE namespace = ? AND key = ?",
+            (namespace, str(key)),
+        ).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return default
+        return json.loads(row[0])
+
+    def set(self, namespace, key, value, ttl=None, max_items=None):
+        """Store value; with max_items, the namespace is trimmed to its newest entries now and then"""
+        now = time.time()
+        db = self._connect()
+        db.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+            (namespace, str(key), json.dumps(value), now + ttl if ttl else None, now),
+        )
+        self._sets += 1
+        if max_items is not None and self._sets % self.PRUNE_EVERY == 0:
+            self.prune(namespace, max_items)
+
+    def prune(self, namespace, max_items):
+        """Drop expired entries and all but the ``max_items`` most recently written"""
+        db = self._connect()
+        db.execute("DELETE FROM entries WHERE namespace = ? AND expires_at < ?", (namespace, time.time()))
+        db.execute(
+            "DELETE FROM entries WHERE namespace = ? AND key NOT IN "
+            "(SELECT key FROM entries WHERE namespace = ? ORDER BY updated_at DESC LIMIT ?)",
+            (namespace, namespace, max_items),
+        )
+
+    def update(self, namespace, key, fn, default=None):
+        """Atomically replace the value with fn(current value) and return it"""
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, str(key)),
+            ).fetchone()
+            value = fn(json.loads(row[0]) if row else default)
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, NULL, ?)",
+                (namespace, str(key), json.dumps(value), time.time()),
+            )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return value
+
+    def items(self, namespace):
+        rows = self._connect().execute(
+            "SELECT key, value FROM entries WHERE namespace = ? AND (expires_at IS NULL OR expires_at >= ?)",
+            (namespace, time.time()),
+        ).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
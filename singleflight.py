@@ -0,0 +1,134 @@
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+def request_key(name, *args):
+    """Canonical hash of a call: same name and JSON-equal arguments give the same key"""
+    canonical = json.dumps([name, args], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def file_digest(file_path):
+    """Hash file contents, so two uploads of the same CV share a key"""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(65536), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse identical in-flight calls into one computation.
+
+    Within a process, callers with the same key wait on the first caller's
+    result. When ``shared_dir`` is set, the leader also holds a per-key lock
+    file and publishes its result to a SQLite table in that directory, so
+    workers in other processes block on the lock and reuse the result
+    instead of recomputing it. A published result is only handed to callers
+    that arrived before it finished, and error payloads are not published;
+    this is not a cache. Rows older than ``result_ttl`` seconds are pruned.
+    """
+
+    def __init__(self, shared_dir=None, result_ttl=30):
+        self.shared_dir = shared_dir
+        self.result_ttl = result_ttl
+        self._lock = threading.Lock()
+        self._calls = {}
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+            with self._connect() as db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS flights "
+                    "(key TEXT PRIMARY KEY, result TEXT, finished_at REAL)"
+                )
+
+    @classmethod
+    def from_env(cls):
+        return cls(shared_dir=os.environ.get("COALESCE_DIR") or None)
+
+    def do(self, key, fn):
+        """Return fn(), or the result of an identical call already running"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # callers may mutate what they get back, so each waiter gets its own copy
+            return copy.deepcopy(call.result)
+
+        try:
+            if self.shared_dir:
+                result = self._do_shared(key, fn)
+            else:
+                result = fn()
+            # keep a private copy for waiters, the leader is free to mutate its own
+            call.result = copy.deepcopy(result)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return result
+
+    def _connect(self):
+        return sqlite3.connect(os.path.join(self.shared_dir, "singleflight.db"), timeout=30)
+
+    def _lock_key(self, key):
+        """Open and flock the key's lock file, retrying if a leader removed it meanwhile"""
+        import fcntl  # POSIX only, and only needed when coalescing across processes
+
+        path = os.path.join(self.shared_dir, f"{key}.lock")
+        while True:
+            lock_file = open(path, "a")
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if os.stat(path).st_ino == os.fstat(lock_file.fileno()).st_ino:
+                    return path, lock_file
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+
+    def _do_shared(self, key, fn):
+        arrived_at = time.time()
+        path, lock_file = self._lock_key(key)
+        try:
+            with self._connect() as db:
+                row = db.execute(
+                    "SELECT result FROM flights WHERE key = ? AND finished_at >= ?",
+                    (key, arrived_at),
+                ).fetchone()
+            if row:
+                return json.loads(row[0])
+
+            result = fn()
+            with self._connect() as db:
+                db.execute("DELETE FROM flights WHERE finished_at <= ?",
+                           (time.time() - self.result_ttl,))
+                if not (isinstance(result, dict) and "error" in result):
+                    db.execute("INSERT OR REPLACE INTO flights VALUES (?, ?, ?)",
+                               (key, json.dumps(result), time.time()))
+            return result
+        finally:
+            # Remove the file while still holding the lock; processes queued on
+            # the old file notice in _lock_key and move on to a fresh one
+            os.unlink(path)
+            lock_file.close()
@@ -0,0 +1,106 @@
+from chunking import (CHARS_PER_TOKEN, OUTPUT_TOKENS_PER_TEXT_TOKEN, PROMPT_OVERHEAD_TOKENS, chunk_budget,
+                      chunk_cv_text, merge_partials, single_pass_budget, split_sections)
+
+CV_TEXT = """Jane Doe
+jane@example.com
+
+EXPERIENCE
+Data Engineer, Acme, 2021-2023
+Built pipelines in Python.
+
+Formation
+MSc Computer Science, Université de Tunis, 2020
+
+Compétences
+Python, SQL, Docker"""
+
+
+def test_split_sections_at_english_and_french_headings():
+    sections = split_sections(CV_TEXT)
+    assert [s.splitlines()[0] for s in sections] == ["Jane Doe", "EXPERIENCE", "Formation", "Compétences"]
+    assert sections[0] == "Jane Doe\njane@example.com"
+
+
+def test_split_sections_ignores_heading_words_inside_sentences():
+    text = "Summary\nI have strong skills in Python and SQL"
+    assert split_sections(text) == [text]
+
+
+def test_chunk_cv_text_keeps_sections_whole_when_they_fit():
+    chunks = chunk_cv_text(CV_TEXT, 80)
+    assert all(len(c) <= 80 for c in chunks)
+    assert any(c.startswith("EXPERIENCE\nData Engineer, Acme") for c in chunks)
+    assert "".join(chunks).replace("\n", "") == CV_TEXT.replace("\n", "")
+
+
+def test_chunk_cv_text_splits_long_sections_and_repeats_heading():
+    text = "Projects\n" + "\n".join(f"Project {i}: a chatbot built with Flask" for i in range(30))
+    chunks = chunk_cv_text(text, 200)
+    assert len(chunks) > 1
+    assert all(len(c) <= 200 for c in chunks)
+    assert all(c.startswith("Projects\n") for c in chunks)
+
+
+def test_chunk_cv_text_hard_wraps_a_single_long_line():
+    chunks = chunk_cv_text("x" * 2500, 1000)
+    assert [len(c) for c in chunks] == [1000, 1000, 500]
+
+
+def test_single_pass_budget_is_smaller_than_chunk_budget():
+    options = {"num_ctx": 1024, "num_predict": 256}
+    assert single_pass_budget(options) < chunk_budget(options)
+
+
+def test_chunk_budget_leaves_room_for_the_answer():
+    for options in ({"num_ctx": 1024, "num_predict": 256}, {"num_ctx": 1024, "num_predict": 512},
+                    {"num_ctx": 8192, "num_predict": 512}):
+        text_tokens = chunk_budget(options) / CHARS_PER_TOKEN
+        assert text_tokens * OUTPUT_TOKENS_PER_TEXT_TOKEN <= options["num_predict"]
+        assert PROMPT_OVERHEAD_TOKENS + text_tokens + options["num_predict"] <= options["num_ctx"]
+
+
+def test_merge_partials_dedupes_and_unions():
+    first = {
+        "personal_info": {"name": "Jane Doe", "email": ""},
+        "experience": [{"title": "Data Engineer", "company": "Acme", "description": "Pipelines",
+                        "technologies": ["Python"]}],
+        "skills": {"technical": ["Python", "SQL"]},
+    }
+    second = {
+        "personal_info": {"name": "J. Doe", "email": "jane@example.com"},
+        "experience": [{"title": " data engineer", "company": "ACME", "description": "Built pipelines",
+                        "technologies": "python, Docker"}],
+        "skills": {"technical": ["sql", "Docker"], "soft": ["Teamwork"]},
+        "certifications": [{"name": "AWS"}, "AWS"],
+    }
+    merged = merge_partials([first, second], "english")
+
+    assert merged["personal_info"]["name"] == "Jane Doe"
+    assert merged["personal_info"]["email"] == "jane@example.com"
+    assert len(merged["experience"]) == 1
+    assert merged["experience"][0]["description"] == "Built pipelines"
+    assert merged["experience"][0]["technologies"] == ["Python", "Docker"]
+    assert merged["skills"] == {"technical": ["Python", "SQL", "Docker"], "soft": ["Teamwork"], "languages": []}
+    assert merged["certifications"] == ["AWS"]
+    assert merged["detected_language"] == "english"
+
+
+def test_merge_partials_splits_string_skills_and_certifications():
+    first = {"skills": {"technical": "Python, SQL", "soft": "Teamwork"}, "certifications": "AWS, GCP"}
+    second = {"skills": "sql, Docker", "certifications": ["GCP", {"name": "CKA"}]}
+    merged = merge_partials([first, second], "english")
+
+    assert merged["skills"] == {"technical": ["Python", "SQL", "Docker"], "soft": ["Teamwork"], "languages": []}
+    assert merged["certifications"] == ["AWS", "GCP", "CKA"]
+
+
+def test_merge_partials_tolerates_non_string_values():
+    first = {"education": [{"degree": "BSc", "institution": "X", "year": 2020}]}
+    second = {"education": [{"degree": "BSc", "institution": "X", "year": "2018-2020", "gpa": None}]}
+    merged = merge_partials([first, second], "english")
+    assert merged["education"] == [{"degree": "BSc", "institution": "X", "year": 2020, "gpa": None}]
+
+
+def test_merge_partials_skips_items_without_keys():
+    merged = merge_partials([{"projects": [{"description": "no name"}, "junk", {"name": "Bot"}]}], "french")
+    assert merged["projects"] == [{"name": "Bot"}]
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from grading import UNANSWERED, grade_submission, grade_submissions, normalize_answer
+
+
+def mcq(options, correct, **extra):
+    return dict({"type": "multiple_choice", "options": options, "correct_answer": correct}, **extra)
+
+
+def test_normalize_answer_prefers_option_text_over_index():
+    question = mcq(["1", "2", "3", "4"], 1)
+    assert normalize_answer("2", question) == 1
+
+
+def test_normalize_answer_prefers_option_text_over_letter():
+    question = mcq(["C", "Java", "Go", "Rust"], 0)
+    assert normalize_answer("C", question) == 0
+
+
+def test_normalize_answer_falls_back_to_index_and_letter():
+    question = mcq(["alpha", "beta", "gamma", "delta"], 2)
+    assert normalize_answer(2, question) == 2
+    assert normalize_answer("2", question) == 2
+    assert normalize_answer("c", question) == 2
+    assert normalize_answer(" Gamma ", question) == 2
+
+
+def test_normalize_answer_true_false_and_unknown():
+    question = {"type": "true_false", "options": ["True", "False"], "correct_answer": 0}
+    assert normalize_answer("False", question) == 1
+    assert normalize_answer(True, question) == 0
+    assert normalize_answer("maybe", question) == UNANSWERED
+    assert normalize_answer(7, question) == UNANSWERED
+    assert normalize_answer(None, question) == UNANSWERED
+
+
+def test_numeric_and_letter_like_options_are_graded_correctly():
+    questions = [mcq(["1", "2", "3", "4"], 1), mcq(["C", "Java", "Go", "Rust"], 0)]
+    result = grade_submission(questions, {0: "2", 1: "C"})
+    assert result["score"] == 100.0
+    assert result["correct_answers"] == 2
+
+
+def test_grade_submissions_scores_by_category_and_difficulty():
+    questions = [
+        mcq(["a", "b", "c", "d"], 2, category="technical", difficulty="easy"),
+        {"type": "true_false", "options": ["True", "False"], "correct_answer": 0,
+         "category": "behavioral", "difficulty": "hard"},
+        mcq(["a", "b", "c", "d"], 1, category="technical", difficulty="hard"),
+    ]
+    graded = grade_submissions(questions, [[2, 0, 1], [2, 1, 0], [], {"1": "True"}])
+
+    np.testing.assert_array_equal(graded["correct_answers"], [3, 1, 0, 1])
+    np.testing.assert_allclose(graded["scores"], [100.0, 100 / 3, 0.0, 100 / 3])
+    np.testing.assert_array_equal(graded["passed"], [True, False, False, False])
+    np.testing.assert_allclose(graded["category_scores"]["technical"], [100.0, 50.0, 0.0, 0.0])
+    np.testing.assert_allclose(graded["category_scores"]["behavioral"], [100.0, 0.0, 0.0, 100.0])
+    np.testing.assert_allclose(graded["difficulty_scores"]["hard"], [100.0, 0.0, 0.0, 50.0])
+
+
+def test_grade_submissions_tolerates_null_and_non_string_labels():
+    questions = [mcq(["a", "b"], 0, category=None, difficulty=3), mcq(["a", "b"], 1, category="technical")]
+    graded = grade_submissions(questions, [[0, 1]])
+    assert set(graded["category_scores"]) == {"general", "technical"}
+    assert set(graded["difficulty_scores"]) == {"3", "medium"}
+
+
+def test_grade_submissions_rejects_non_positional_keys():
+    with pytest.raises(ValueError):
+        grade_submissions([mcq(["a", "b"], 0)], [{"q1": "a"}])
+
+
+def test_grade_submission_without_questions():
+    result = grade_submission([], [])
+    assert result["score"] == 0.0
+    assert result["category_scores"] == {}
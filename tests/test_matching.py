@@ -0,0 +1,49 @@
+from matching import explanation_key, rank_jobs
+from models import Job, ParsedCV
+
+CV = ParsedCV.from_dict({
+    "skills": {"technical": ["Python", "SQL"]},
+    "projects": [{"name": "Bot", "technologies": ["Docker"]}],
+})
+
+
+def job(job_id, title, requirements, company=None):
+    return Job.from_dict({"job_id": job_id, "job_title": title, "company": company,
+                          "requirements": requirements})
+
+
+def test_rank_jobs_orders_by_score_then_position():
+    jobs = [
+        job("1", "Frontend", "React, CSS"),
+        job("2", "Backend", "Python, SQL, Go"),
+        job("3", "Data", "python, sql"),
+        job("4", "DevOps", "Docker, Kubernetes"),
+    ]
+    matches = rank_jobs(CV, jobs)
+
+    assert [m["job_id"] for m in matches] == ["3", "2", "4"]
+    assert matches[0]["similarity_score"] > matches[1]["similarity_score"] > matches[2]["similarity_score"]
+    assert matches[1]["matching_skills"] == ["Python", "SQL"]
+    assert matches[1]["missing_skills"] == ["Go"]
+    assert all(m["match_explanation"] == "" for m in matches)
+
+
+def test_explanation_key_ignores_skill_case_and_order():
+    a = {"job_title": "Backend Dev", "matching_skills": ["Python", "SQL"], "missing_skills": ["Go"]}
+    b = {"job_title": "Backend Dev", "matching_skills": ["sql", "python"], "missing_skills": ["go"]}
+    assert explanation_key(a) == explanation_key(b)
+
+
+def test_explanation_key_changes_with_any_prompt_input():
+    base = {"job_id": "1", "job_title": "Backend Dev", "company": "X",
+            "matching_skills": ["Python"], "missing_skills": ["Go"]}
+    variants = [
+        dict(base, job_title="Data Scientist"),
+        dict(base, company="Y"),
+        dict(base, matching_skills=["Python", "SQL"]),
+        dict(base, missing_skills=["Spark", "ML"]),
+    ]
+    keys = {explanation_key(base)} | {explanation_key(v) for v in variants}
+    assert len(keys) == 5
+    # a reused job id alone does not make two matches share an explanation
+    assert explanation_key(dict(base, job_id="2")) == explanation_key(base)
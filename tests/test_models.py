@@ -0,0 +1,68 @@
+import pytest
+
+from models import Job, ParsedCV, Question, SkillRegistry, dumps, loads
+
+CV = {
+    "personal_info": {"name": "Jane Doe", "email": "jane@example.com"},
+    "summary": "Data engineer",
+    "education": [{"degree": "MSc", "institution": "Université de Tunis", "year": "2020"}],
+    "experience": [{"title": "Data Engineer", "company": "Acme", "duration": "2021-2023",
+                    "description": "Built pipelines", "technologies": ["Python", "Airflow"]}],
+    "skills": {"technical": ["Python", "SQL"], "soft": ["Teamwork"], "languages": ["French"]},
+    "certifications": ["AWS"],
+    "projects": [{"name": "Bot", "description": "A chatbot", "technologies": ["Flask"], "url": ""}],
+    "detected_language": "english",
+    "hobbies": "chess",
+}
+JOB = {"job_id": "7", "job_title": "Backend Dev", "company": "X", "job_type": "PFE",
+       "description": "APIs", "requirements": "Python, SQL", "skills": ["Python", "SQL"]}
+QUESTION = {"id": 1, "question": "2 + 2?", "type": "multiple_choice",
+            "options": ["3", "4", "5", "6"], "correct_answer": 1, "explanation": "",
+            "difficulty": "easy", "category": "technical"}
+
+
+@pytest.mark.parametrize("cls, data", [(ParsedCV, CV), (Job, JOB), (Question, QUESTION)])
+def test_from_dict_to_dict_round_trips(cls, data):
+    assert cls.from_dict(data).to_dict() == data
+
+
+def test_unexpected_shapes_are_kept_in_extra():
+    data = {"job_title": 42, "skills": {"not": "a list"}, "salary": "1k"}
+    job = Job.from_dict(data)
+    assert job.job_title is None
+    assert job.to_dict() == data
+
+
+def test_string_skills_are_split_and_come_back_as_a_list():
+    job = Job.from_dict(dict(JOB, skills="Python, SQL"))
+    assert job.skills == ("Python", "SQL")
+    assert job.to_dict()["skills"] == ["Python", "SQL"]
+
+
+def test_string_technologies_count_as_skills():
+    cv = ParsedCV.from_dict({
+        "skills": {"technical": ["Python"]},
+        "experience": [{"title": "Dev", "technologies": "Docker"}],
+        "projects": [{"name": "Bot", "technologies": "Flask, Docker"}],
+    })
+    assert cv.all_skills() == ["Python", "Docker", "Flask", "Docker"]
+
+
+def test_msgpack_round_trips_records():
+    pytest.importorskip("msgpack")
+    records = [ParsedCV.from_dict(CV), Job.from_dict(JOB), Question.from_dict(QUESTION)]
+    restored = loads(dumps(records))
+    assert restored == records
+    assert [r.to_dict() for r in restored] == [CV, JOB, QUESTION]
+    assert restored[0].skill_ids == records[0].skill_ids
+
+
+def test_skill_registry_is_bounded():
+    registry = SkillRegistry(max_size=2)
+    a, b = registry.intern("Python"), registry.intern("SQL")
+    overflow = registry.intern(" Go ")
+    assert len(registry) == 2
+    assert registry.intern("python") == a
+    assert overflow == registry.intern("go")
+    assert overflow not in (a, b)
+    assert registry.name(overflow) == "go"
@@ -0,0 +1,111 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight, request_key
+
+
+def run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+
+
+def test_request_key_ignores_dict_order():
+    assert request_key("match", {"a": 1, "b": 2}) == request_key("match", {"b": 2, "a": 1})
+    assert request_key("match", {"a": 1}) != request_key("quiz", {"a": 1})
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    calls, results = [], []
+
+    def fn():
+        calls.append(1)
+        time.sleep(0.3)
+        return {"matches": [1, 2]}
+
+    run_concurrently(8, lambda: results.append(flight.do("key", fn)))
+
+    assert len(calls) == 1
+    assert results == [{"matches": [1, 2]}] * 8
+    # every caller gets its own copy
+    assert len({id(r) for r in results}) == 8
+
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+    calls, errors = [], []
+
+    def fn():
+        calls.append(1)
+        time.sleep(0.3)
+        raise ValueError("model unavailable")
+
+    def call():
+        try:
+            flight.do("key", fn)
+        except ValueError as e:
+            errors.append(str(e))
+
+    run_concurrently(5, call)
+
+    assert len(calls) == 1
+    assert errors == ["model unavailable"] * 5
+
+
+def test_finished_calls_are_not_reused():
+    flight = SingleFlight()
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.do("key", lambda: 2) == 2
+
+
+def _coalesced_call(shared_dir, log_path, results):
+    def fn():
+        with open(log_path, "a") as log:
+            log.write(f"{os.getpid()}\n")
+        time.sleep(1)
+        return {"value": 42}
+
+    results.put(SingleFlight(shared_dir).do("key", fn))
+
+
+@pytest.mark.skipif(os.name != "posix", reason="cross-process coalescing uses flock")
+def test_processes_share_one_call(tmp_path):
+    ctx = multiprocessing.get_context("fork")
+    shared_dir = str(tmp_path / "flights")
+    log_path = str(tmp_path / "calls.log")
+    SingleFlight(shared_dir)
+
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_coalesced_call, args=(shared_dir, log_path, results))
+                 for _ in range(4)]
+    for p in processes:
+        p.start()
+    values = [results.get(timeout=30) for _ in processes]
+    for p in processes:
+        p.join(timeout=10)
+
+    assert values == [{"value": 42}] * 4
+    with open(log_path) as log:
+        assert len(log.read().split()) == 1
+    # the leader removes its lock file
+    assert [name for name in os.listdir(shared_dir) if name.endswith(".lock")] == []
+
+    # a later call computes again instead of reading the published result
+    assert SingleFlight(shared_dir).do("key", lambda: {"value": 7}) == {"value": 7}
+
+
+def test_shared_error_payloads_are_not_published(tmp_path):
+    flight = SingleFlight(str(tmp_path))
+    arrived = time.time()
+    flight.do("key", lambda: {"error": "Failed to parse CV"})
+
+    with flight._connect() as db:
+        rows = db.execute("SELECT key FROM flights WHERE finished_at >= ?", (arrived,)).fetchall()
+    assert rows == []
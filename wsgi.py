@@ -0,0 +1,16 @@
+"""WSGI entry point for production serving: gunicorn -c gunicorn.conf.py wsgi:app"""
+import gc
+
+from api import app, crew
+
+
+def preload():
+    """Warm up everything workers share before the server forks them"""
+    crew.router.check_all()
+    # Move the objects built so far out of the GC's view so that collections
+    # in the workers don't touch (and copy) the pages they live on.
+    gc.collect()
+    gc.freeze()
+
+
+preload()